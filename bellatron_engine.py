@@ -14,13 +14,21 @@ Run:
 """
 
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple, Any
+from dataclasses import dataclass, asdict, field, fields, is_dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Any, Union
 from math import isfinite
 import statistics as stats
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import groupby
 from datetime import datetime, timezone
 import argparse, pathlib, json, re
 
+try:
+    import orjson  # optional: faster JSON output, native dataclass support
+except ImportError:
+    orjson = None
+
 VERSION = "2.4"
 ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z")
 
@@ -28,50 +36,142 @@ ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z")
 # Parsing
 # -------------------------------------------------
 
-def parse_iso(ts: str) -> Optional[datetime]:
-    if ISO_RE.match(ts):
-        return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+def parse_iso(ts: str, strict: bool = False) -> Optional[datetime]:
+    # Hot path: fixed-layout slicing (YYYY-MM-DDTHH:MM:SSZ) instead of regex + strptime.
+    # strict=True keeps the original ISO_RE/strptime validation.
+    if strict:
+        if ISO_RE.fullmatch(ts):
+            try:
+                return datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            except ValueError:
+                return None
+        return None
+    if (len(ts) == 20 and ts[4] == "-" and ts[7] == "-" and ts[10] == "T"
+            and ts[13] == ":" and ts[16] == ":" and ts[19] == "Z"):
+        y, mo, d, h, mi, s = ts[0:4], ts[5:7], ts[8:10], ts[11:13], ts[14:16], ts[17:19]
+        digits = y + mo + d + h + mi + s
+        # int() alone would accept signs, underscores and spaces
+        if not (digits.isascii() and digits.isdigit()):
+            return None
+        try:
+            return datetime(int(y), int(mo), int(d), int(h), int(mi), int(s),
+                            tzinfo=timezone.utc)
+        except ValueError:
+            return None
     return None
 
 def fmt_ts(dt: Optional[datetime]) -> str:
     return dt.strftime("%Y-%m-%d %H:%M:%S") if dt else "?"
 
+def _fast_iso(dt: Optional[datetime]) -> Optional[str]:
+    # UTC, whole seconds (as produced by parse_iso); same text as isoformat().replace("+00:00","Z")
+    if dt is None:
+        return None
+    return "%04d-%02d-%02dT%02d:%02d:%02dZ" % (dt.year, dt.month, dt.day,
+                                              dt.hour, dt.minute, dt.second)
+
 def parse_kv(s: str) -> Dict[str, str]:
     out: Dict[str, str] = {}
     for tok in s.split():
-        if "=" in tok:
-            k, v = tok.split("=", 1)
+        k, sep, v = tok.partition("=")
+        if sep:
             out[k] = v
     return out
 
-@dataclass
+NAN = float("nan")
+TYPED_EVENTS = {"MOVE", "SNAPSHOT"}
+
+@dataclass(slots=True)
 class Event:
     ts: Optional[datetime]
     typ: str
-    kv: Dict[str, str]
+    kv_raw: Union[str, Dict[str, str]]  # unparsed "k=v k=v" payload (or an already-parsed dict)
     line: int
 
-    def f(self, k, d=float("nan")) -> float:
-        try:
-            return float(self.kv.get(k, d))
-        except:
-            return d
-
-    def i(self, k, d=-1) -> int:
-        try:
-            return int(self.kv.get(k, d))
-        except:
-            return d
-
-@dataclass
+    # typed fields, converted once at parse time for MOVE/SNAPSHOT
+    to: str = ""
+    end_reason: str = ""
+    reed_end: int = -1
+    reed_settle_30s: int = -1
+    duration_ms: int = -1
+    start_deg: float = NAN
+    end_deg: float = NAN
+    hum: float = NAN
+
+    _kv: Optional[Dict[str, str]] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Event(ts, typ, {...}, line) as before kv_raw: use the dict as the parsed kv
+        if isinstance(self.kv_raw, dict):
+            self._kv = self.kv_raw
+            if self.typ in TYPED_EVENTS:
+                _convert_fields(self)
+
+    @property
+    def kv(self) -> Dict[str, str]:
+        # parsed on first access; MOVE/SNAPSHOT are parsed eagerly by parse_log
+        if self._kv is None:
+            self._kv = parse_kv(self.kv_raw)
+        return self._kv
+
+@dataclass(slots=True)
 class ParsedLog:
     header: Dict[str, str]
     events: List[Event]
 
+def _convert_fields(e: Event) -> None:
+    kv = e.kv
+    e.to = kv.get("to", "")
+    e.end_reason = kv.get("end_reason", "")
+    try:
+        e.reed_end = int(kv["reed_end"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        e.reed_settle_30s = int(kv["reed_settle_30s"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        e.duration_ms = int(kv["duration_ms"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        e.start_deg = float(kv["start_deg"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        e.end_deg = float(kv["end_deg"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        e.hum = float(kv["hum"])
+    except (KeyError, ValueError):
+        pass
+
+# Same line boundaries as str.splitlines(): \r\n, \n, \r, \v, \f, \x1c-\x1e, \x85, \u2028, \u2029
+_LINE_RE = re.compile(
+    r"([^\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]*)(?:\r\n|[\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029])"
+    r"|([^\n\r\x0b\x0c\x1c-\x1e\x85\u2028\u2029]+)")
+
+def _iter_lines(text: str) -> Iterable[str]:
+    # lazy text.splitlines(): one line alive at a time instead of a full list
+    for m in _LINE_RE.finditer(text):
+        line = m.group(1)
+        yield line if line is not None else m.group(2)
+
 def parse_log(text: str) -> ParsedLog:
+    return parse_log_lines(_iter_lines(text))
+
+def parse_log_file(fh: Iterable[str]) -> ParsedLog:
+    # Text-mode files only break on \n/\r/\r\n; re-split each chunk so the line
+    # boundaries (and Event.line numbers) match parse_log / str.splitlines().
+    return parse_log_lines(ln for chunk in fh for ln in chunk.splitlines())
+
+def parse_log_lines(lines: Iterable[str]) -> ParsedLog:
+    # lines may be any iterable, e.g. an open text file; trailing newlines are stripped
     header: Dict[str, str] = {}
     events: List[Event] = []
-    for ln, raw in enumerate(text.splitlines(), 1):
+    for ln, raw in enumerate(lines, 1):
         line = raw.strip()
         if not line:
             continue
@@ -83,109 +183,134 @@ def parse_log(text: str) -> ParsedLog:
             continue
         ts = parse_iso(parts[0])
         typ = parts[1]
-        kv = parse_kv(parts[2] if len(parts) > 2 else "")
-        events.append(Event(ts, typ, kv, ln))
+        e = Event(ts, typ, parts[2] if len(parts) > 2 else "", ln)
+        if typ in TYPED_EVENTS:
+            e._kv = parse_kv(e.kv_raw)
+            _convert_fields(e)
+        events.append(e)
     return ParsedLog(header, events)
 
 # -------------------------------------------------
 # Baselines
 # -------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Baselines:
     closed: Optional[float] = None
     open: Optional[float] = None
     max_travel: Optional[float] = None
     learned: bool = False
 
-def learn_baselines(events: List[Event]) -> Baselines:
-    closed_vals: List[float] = []
-    open_vals: List[float] = []
-    travels: List[float] = []
-
-    for e in events:
-        if e.typ != "MOVE":
-            continue
-        if e.kv.get("end_reason") == "timeout":
-            continue
-
-        s, end = e.f("start_deg"), e.f("end_deg")
-        if not (isfinite(s) and isfinite(end)):
-            continue
-
-        travels.append(abs(end - s))
-        if e.kv.get("to") == "closed":
-            closed_vals.append(end)
-        elif e.kv.get("to") == "open":
-            open_vals.append(end)
-
-    bl = Baselines()
-    if closed_vals:
-        bl.closed = stats.median(closed_vals)
-    if open_vals:
-        bl.open = stats.median(open_vals)
-    if travels:
-        bl.max_travel = max(travels)
-
-    bl.learned = bl.closed is not None and bl.max_travel is not None
-    return bl
-
 # -------------------------------------------------
 # Snapshot correlation (Option 2)
 # -------------------------------------------------
 
-def build_snapshot_series(events: List[Event]) -> List[Tuple[datetime, float]]:
+# (ts_list, hum_list): parallel lists sorted by time; snapshots sharing a
+# timestamp stay in log order (stable sort)
+SnapshotSeries = Tuple[List[datetime], List[float]]
+
+def build_snapshot_series(events: List[Event]) -> SnapshotSeries:
     series: List[Tuple[datetime, float]] = []
     for e in events:
         if e.typ != "SNAPSHOT":
             continue
         if e.ts is None:
             continue
-        h = e.f("hum")
+        h = e.hum
         if isfinite(h):
             series.append((e.ts, h))
     series.sort(key=lambda x: x[0])
-    return series
-
-def nearest_snapshot_humidity(series: List[Tuple[datetime, float]],
+    return [ts0 for ts0, _ in series], [h for _, h in series]
+
+HINT_STEPS = 8  # forward steps tried from the previous hit before bisecting
+
+def _snapshot_index(ts_list: List[datetime],
+                    t: datetime,
+                    state: Optional[Dict[str, int]]) -> int:
+    # bisect_left position of t in ts_list; with state, start from the last hit
+    # (close events arrive roughly in time order) before falling back to bisect.
+    if state is None:
+        return bisect_left(ts_list, t)
+
+    n = len(ts_list)
+    j = min(state.get("last_idx", 0), n)
+    if j > 0 and ts_list[j-1] >= t:
+        j = bisect_left(ts_list, t, 0, j)
+    else:
+        stop = min(n, j + HINT_STEPS)
+        while j < stop and ts_list[j] < t:
+            j += 1
+        if j < n and ts_list[j] < t:
+            j = bisect_left(ts_list, t, j)
+    state["last_idx"] = j
+    return j
+
+def nearest_snapshot_humidity(series: SnapshotSeries,
                               t: Optional[datetime],
-                              max_age_s: int = 10 * 60) -> Optional[float]:
-    if not series or t is None:
+                              max_age_s: int = 10 * 60,
+                              state: Optional[Dict[str, int]] = None) -> Optional[float]:
+    ts_list, hum_list = series
+    if not ts_list or t is None:
         return None
 
-    lo, hi = 0, len(series) - 1
-    while lo <= hi:
-        mid = (lo + hi) // 2
-        if series[mid][0] < t:
-            lo = mid + 1
-        elif series[mid][0] > t:
-            hi = mid - 1
-        else:
-            return series[mid][1]
-
-    candidates = []
-    if 0 <= hi < len(series):
-        candidates.append(series[hi])
-    if 0 <= lo < len(series):
-        candidates.append(series[lo])
+    j = _snapshot_index(ts_list, t, state)
 
     best = None
     best_dt = None
-    for ts0, hum0 in candidates:
-        dt_s = abs((ts0 - t).total_seconds())
+    if j > 0:
+        best_dt = (t - ts_list[j-1]).total_seconds()
+        best = hum_list[j-1]
+    if j < len(ts_list):
+        dt_s = (ts_list[j] - t).total_seconds()
         if best_dt is None or dt_s < best_dt:
             best_dt = dt_s
-            best = hum0
+            # several snapshots at the chosen time: the last one logged wins
+            # (ts_list[j-1] is already the last of its group)
+            if j + 1 < len(ts_list) and ts_list[j+1] == ts_list[j]:
+                j = bisect_right(ts_list, ts_list[j], j) - 1
+            best = hum_list[j]
 
     if best_dt is not None and best_dt <= max_age_s:
         return best
     return None
 
+def nearest_snapshot_humidities(series: SnapshotSeries,
+                                times: List[Optional[datetime]],
+                                max_age_s: int = 10 * 60) -> List[Optional[float]]:
+    # Batched lookup in log order, sharing one last-index hint across calls.
+    state = {"last_idx": 0}
+    return [nearest_snapshot_humidity(series, t, max_age_s, state) for t in times]
+
 # -------------------------------------------------
 # Analysis
 # -------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
+class CloseColumns:
+    # close attempts (MOVE to=closed) as parallel columns, in log order
+    ts: List[Optional[datetime]]
+    duration_ms: List[int]
+    reed_end: List[int]
+    reed_settle_30s: List[int]
+    start_deg: List[float]
+    end_deg: List[float]
+    hum: List[float]
+    end_reason: List[str]
+
+def close_columns(events: List[Event]) -> CloseColumns:
+    closes = [e for e in events if e.typ == "MOVE" and e.to == "closed"]
+    return CloseColumns(
+        ts=[e.ts for e in closes],
+        duration_ms=[e.duration_ms for e in closes],
+        reed_end=[e.reed_end for e in closes],
+        reed_settle_30s=[e.reed_settle_30s for e in closes],
+        start_deg=[e.start_deg for e in closes],
+        end_deg=[e.end_deg for e in closes],
+        hum=[e.hum for e in closes],
+        end_reason=[e.end_reason for e in closes],
+    )
+
+@dataclass(slots=True)
 class Features:
     good: int = 0
     marginal: int = 0
@@ -202,21 +327,147 @@ class Features:
     intermittent_soft: bool = False
     intermittent_hard: bool = False
 
-@dataclass
+@dataclass(slots=True)
+class TimelineArrays:
+    # one column per timeline field, one row per close attempt;
+    # rows are only built as dicts for output (to_dicts)
+    ts: List[Optional[str]]
+    outcome: List[str]
+    duration_ms: List[int]
+    slow: List[bool]
+    hum_near: List[Optional[float]]
+    wet: List[bool]
+    start_deg: List[Optional[float]]
+    end_deg: List[Optional[float]]
+    travel_pct: List[Optional[float]]
+    end_reason: List[str]
+    reed_end: List[int]
+    reed_settle_30s: List[int]
+    drift: List[bool]
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        cols = [getattr(self, k) for k in TIMELINE_KEYS]
+        return [dict(zip(TIMELINE_KEYS, row)) for row in zip(*cols)]
+
+TIMELINE_KEYS = tuple(f.name for f in fields(TimelineArrays))
+
+@dataclass(slots=True)
 class Confidence:
     score: float
     level: str  # HIGH/MED/LOW
     reasons: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class Diagnosis:
     scores: Dict[str, float]
     recommendations: List[str]
     notes: List[str]
     confidence: Confidence
-    timeline_events: List[Dict[str, Any]]
+    timeline: TimelineArrays
     episodes: List[Dict[str, Any]]
 
+# Close outcome by reed_end (row) and travel_pct bucket (column).
+TP_THRESHOLDS = [0.60, 0.80, 0.95]  # bucket = bisect_right(TP_THRESHOLDS, tp)
+TP_UNKNOWN = len(TP_THRESHOLDS) + 1  # travel_pct not available
+REED_ROW = {0: 1, 1: 2}  # any other reed_end value -> row 0
+OUTCOME_TABLE = (
+    # tp <0.60         <0.80             <0.95             >=0.95            unknown
+    ("UNKNOWN",        "UNKNOWN",        "UNKNOWN",        "UNKNOWN",        "UNKNOWN"),     # reed ?
+    ("HARD_FAIL",      "LATCH_MISS",     "LATCH_MISS",     "LATCH_MISS",     "HARD_FAIL"),   # reed 0
+    ("MARGINAL_CLOSE", "MARGINAL_CLOSE", "MARGINAL_CLOSE", "GOOD_CLOSE",     "GOOD_CLOSE"),  # reed 1
+)
+
+def _classify_closes(reed_end: List[int],
+                     reed_settle_30s: List[int],
+                     start_deg: List[float],
+                     end_deg: List[float],
+                     duration_ms: List[int],
+                     slow_cut: Optional[float],
+                     max_travel: Optional[float],
+                     ) -> Tuple[List[Optional[float]], List[bool], List[bool], List[str], Counter]:
+    # Numeric kernel over the close columns -> (travel_pct, slow, drift, outcome, outcome counts).
+    # One comprehension per column; measured faster than a single loop with appends.
+    n = len(reed_end)
+    if max_travel:
+        tps = [abs(end - s) / max_travel if isfinite(s) and isfinite(end) else None
+               for s, end in zip(start_deg, end_deg)]
+    else:
+        tps = [None] * n
+
+    if slow_cut:
+        slows = [dur > slow_cut for dur in duration_ms]
+    else:
+        slows = [False] * n
+
+    drifts = [reed == 1 and reed30 == 0 for reed, reed30 in zip(reed_end, reed_settle_30s)]
+
+    tp_buckets = [TP_UNKNOWN if tp is None else bisect_right(TP_THRESHOLDS, tp) for tp in tps]
+    outcomes = [OUTCOME_TABLE[REED_ROW.get(reed, 0)][b]
+                for reed, b in zip(reed_end, tp_buckets)]
+    return tps, slows, drifts, outcomes, Counter(outcomes)
+
+def _median_sorted(xs: List[int], n: int) -> float:
+    # median of the first n items of an already-sorted list (same result as stats.median)
+    m = n // 2
+    if n % 2:
+        return xs[m]
+    return (xs[m - 1] + xs[m]) / 2
+
+def _true_runs(mask: List[bool]) -> List[Tuple[int, int]]:
+    # (start, end) index pairs of each run of consecutive True values
+    runs: List[Tuple[int, int]] = []
+    i = 0
+    for v, grp in groupby(mask):
+        n = len(list(grp))
+        if v:
+            runs.append((i, i + n - 1))
+        i += n
+    return runs
+
+def _build_episodes(timeline: TimelineArrays) -> List[Dict[str, Any]]:
+    episodes: List[Dict[str, Any]] = []
+
+    def add_episode(kind: str, start_idx: int, end_idx: int):
+        episodes.append({
+            "kind": kind,
+            "start_ts": timeline.ts[start_idx],
+            "end_ts": timeline.ts[end_idx],
+            "count": end_idx - start_idx + 1,
+        })
+
+    # Build episodes from run-length encoded masks, in precedence order. Scanning
+    # forward from i, the earliest run wins (ties go to the earlier kind) and the
+    # episode extends to the end of that kind's run.
+    kinds = ["MECHANICAL_HARD_FAIL_WINDOW", "HUMIDITY_DRAG_WINDOW", "POST_CLOSE_DRIFT_WINDOW"]
+    runs = [
+        _true_runs([o == "HARD_FAIL" for o in timeline.outcome]),
+        _true_runs([a and b for a, b in zip(timeline.slow, timeline.wet)]),
+        _true_runs(timeline.drift),
+    ]
+    pos = [0] * len(runs)
+    i = 0
+    while True:
+        best = None
+        for k, rs in enumerate(runs):
+            p = pos[k]
+            while p < len(rs) and rs[p][1] < i:
+                p += 1
+            pos[k] = p
+            if p < len(rs):
+                start = max(rs[p][0], i)
+                if best is None or start < best[0]:
+                    best = (start, k)
+        if best is None:
+            break
+        start, k = best
+        end = runs[k][pos[k]][1]
+        add_episode(kinds[k], start, end)
+        i = end + 1
+    return episodes
+
 def _confidence_level(score: float) -> str:
     if score >= 0.75:
         return "HIGH"
@@ -225,97 +476,92 @@ def _confidence_level(score: float) -> str:
     return "LOW"
 
 def analyze(parsed: ParsedLog) -> Tuple[Baselines, Features, Diagnosis]:
-    bl = learn_baselines(parsed.events)
+    # single pass over events: baseline accumulators + bucket snapshots / closes
+    closed_vals: List[float] = []
+    open_vals: List[float] = []
+    max_travel: Optional[float] = None
+    snapshots: List[Event] = []
+    closes: List[Event] = []
+
+    for e in parsed.events:
+        if e.typ == "SNAPSHOT":
+            snapshots.append(e)
+            continue
+        if e.typ != "MOVE":
+            continue
+        if e.to == "closed":
+            closes.append(e)
+        if e.end_reason == "timeout":
+            continue
+
+        s, end = e.start_deg, e.end_deg
+        if not (isfinite(s) and isfinite(end)):
+            continue
+
+        travel = abs(end - s)
+        if max_travel is None or travel > max_travel:
+            max_travel = travel
+        if e.to == "closed":
+            closed_vals.append(end)
+        elif e.to == "open":
+            open_vals.append(end)
+
+    bl = Baselines(max_travel=max_travel)
+    if closed_vals:
+        bl.closed = stats.median(closed_vals)
+    if open_vals:
+        bl.open = stats.median(open_vals)
+    bl.learned = bl.closed is not None and bl.max_travel is not None
+
     ft = Features()
 
-    snap_series = build_snapshot_series(parsed.events)
-    if snap_series:
-        ft.median_humidity = stats.median([h for _, h in snap_series])
+    snap_series = build_snapshot_series(snapshots)
+    snap_hums = snap_series[1]
+    if snap_hums:
+        ft.median_humidity = stats.median(snap_hums)
 
-    closes = [e for e in parsed.events if e.typ == "MOVE" and e.kv.get("to") == "closed"]
+    cc = close_columns(closes)
 
-    durs = sorted(e.i("duration_ms") for e in closes if e.i("duration_ms") > 0)
+    durs = sorted(d for d in cc.duration_ms if d > 0)
     base = None
     if durs:
-        base = stats.median(durs[:max(1, len(durs)//3)])
-        ft.slow_ratio = max(d / base for d in durs) if base > 0 else 1.0
-
-    slow_hums: List[float] = []
-    timeline: List[Dict[str, Any]] = []
+        base = _median_sorted(durs, max(1, len(durs)//3))
+        ft.slow_ratio = durs[-1] / base if base > 0 else 1.0
 
     # thresholds (tune later if needed)
     SLOW_FACTOR = 1.3
     HUM_WET = 75.0
 
-    for e in closes:
-        reed = e.i("reed_end", -1)
-        reed30 = e.i("reed_settle_30s", -1)
-        reason = e.kv.get("end_reason", "")
-
-        s, end = e.f("start_deg"), e.f("end_deg")
-        tp = None
-        if bl.max_travel and isfinite(s) and isfinite(end):
-            tp = abs(end - s) / bl.max_travel
-
-        dur = e.i("duration_ms", -1)
-        is_slow = bool(base and dur > 0 and dur > base * SLOW_FACTOR)
-
-        # humidity correlated to this MOVE (Option 2)
-        hum_move = e.f("hum")
-        hum_near = None
-        if isfinite(hum_move):
-            hum_near = hum_move
-        else:
-            hum_near = nearest_snapshot_humidity(snap_series, e.ts, max_age_s=10*60)
-
-        if is_slow and hum_near is not None:
-            slow_hums.append(hum_near)
-
-        # classification
-        outcome = "UNKNOWN"
-        if reed == 1:
-            if tp is None or tp >= 0.95:
-                ft.good += 1
-                outcome = "GOOD_CLOSE"
-            elif tp >= 0.80:
-                ft.marginal += 1
-                outcome = "MARGINAL_CLOSE"
-            else:
-                ft.marginal += 1
-                outcome = "MARGINAL_CLOSE"
-        elif reed == 0:
-            if tp is None:
-                ft.hard_fail += 1
-                outcome = "HARD_FAIL"
-            elif tp < 0.60:
-                ft.hard_fail += 1
-                outcome = "HARD_FAIL"
-            elif tp < 0.80:
-                ft.latch_miss += 1
-                outcome = "LATCH_MISS"
-            else:
-                ft.latch_miss += 1
-                outcome = "LATCH_MISS"
-
-        drifted = (reed == 1 and reed30 == 0)
-        if drifted:
-            ft.drift += 1
-
-        timeline.append({
-            "ts": e.ts.isoformat().replace("+00:00","Z") if e.ts else None,
-            "outcome": outcome,
-            "duration_ms": dur,
-            "slow": is_slow,
-            "hum_near": hum_near,
-            "wet": (hum_near is not None and hum_near >= HUM_WET),
-            "start_deg": s if isfinite(s) else None,
-            "end_deg": end if isfinite(end) else None,
-            "travel_pct": tp,
-            "end_reason": reason,
-            "reed_end": reed,
-            "reed_settle_30s": reed30,
-            "drift": drifted,
-        })
+    tps, slows, drifts, outcomes, counts = _classify_closes(
+        cc.reed_end, cc.reed_settle_30s, cc.start_deg, cc.end_deg, cc.duration_ms,
+        base * SLOW_FACTOR if base else None, bl.max_travel)
+    ft.good = counts["GOOD_CLOSE"]
+    ft.marginal = counts["MARGINAL_CLOSE"]
+    ft.latch_miss = counts["LATCH_MISS"]
+    ft.hard_fail = counts["HARD_FAIL"]
+    ft.drift = sum(drifts)
+
+    # humidity correlated to each MOVE (Option 2)
+    near = nearest_snapshot_humidities(snap_series, cc.ts, max_age_s=10*60)
+    hums = [h if isfinite(h) else h_near for h, h_near in zip(cc.hum, near)]
+
+    slow_hums = [h for is_slow, h in zip(slows, hums) if is_slow and h is not None]
+
+    timeline = TimelineArrays(
+        ts=[_fast_iso(t) for t in cc.ts],
+        outcome=outcomes,
+        duration_ms=cc.duration_ms,
+        slow=slows,
+        hum_near=hums,
+        wet=[h is not None and h >= HUM_WET for h in hums],
+        start_deg=[s if isfinite(s) else None for s in cc.start_deg],
+        end_deg=[end if isfinite(end) else None for end in cc.end_deg],
+        travel_pct=tps,
+        end_reason=cc.end_reason,
+        reed_end=cc.reed_end,
+        reed_settle_30s=cc.reed_settle_30s,
+        drift=drifts,
+    )
 
     if slow_hums:
         ft.slow_close_samples = len(slow_hums)
@@ -386,51 +632,7 @@ def analyze(parsed: ParsedLog) -> Tuple[Baselines, Features, Diagnosis]:
         recs.append("No clear fault pattern detected from this log. Capture more events or add INTENT signals (LAM/safety) via WillexOS controller for higher certainty.")
 
     # Episodes: group consecutive timeline events of certain classes
-    episodes: List[Dict[str, Any]] = []
-
-    def add_episode(kind: str, start_idx: int, end_idx: int):
-        seg = timeline[start_idx:end_idx+1]
-        t0 = seg[0].get("ts")
-        t1 = seg[-1].get("ts")
-        count = len(seg)
-        episodes.append({
-            "kind": kind,
-            "start_ts": t0,
-            "end_ts": t1,
-            "count": count,
-        })
-
-    # Build episodes
-    i = 0
-    while i < len(timeline):
-        o = timeline[i]["outcome"]
-        slow_wet = bool(timeline[i]["slow"] and timeline[i]["wet"])
-
-        if o == "HARD_FAIL":
-            j = i
-            while j+1 < len(timeline) and timeline[j+1]["outcome"] == "HARD_FAIL":
-                j += 1
-            add_episode("MECHANICAL_HARD_FAIL_WINDOW", i, j)
-            i = j + 1
-            continue
-
-        if slow_wet:
-            j = i
-            while j+1 < len(timeline) and (timeline[j+1]["slow"] and timeline[j+1]["wet"]):
-                j += 1
-            add_episode("HUMIDITY_DRAG_WINDOW", i, j)
-            i = j + 1
-            continue
-
-        if timeline[i]["drift"]:
-            j = i
-            while j+1 < len(timeline) and timeline[j+1]["drift"]:
-                j += 1
-            add_episode("POST_CLOSE_DRIFT_WINDOW", i, j)
-            i = j + 1
-            continue
-
-        i += 1
+    episodes = _build_episodes(timeline)
 
     # Confidence grading
     reasons: List[str] = []
@@ -453,7 +655,7 @@ def analyze(parsed: ParsedLog) -> Tuple[Baselines, Features, Diagnosis]:
     else:
         reasons.append("Baselines not learned (reduced travel inference).")
 
-    reed_known = sum(1 for t in timeline if t["reed_end"] in (0, 1))
+    reed_known = sum(1 for r in timeline.reed_end if r in (0, 1))
     if closes_n:
         reed_cov = reed_known / closes_n
         if reed_cov >= 0.9:
@@ -497,7 +699,7 @@ def analyze(parsed: ParsedLog) -> Tuple[Baselines, Features, Diagnosis]:
         recommendations=recs,
         notes=notes,
         confidence=conf,
-        timeline_events=timeline,
+        timeline=timeline,
         episodes=episodes,
     )
     return bl, ft, dx
@@ -510,13 +712,12 @@ def render_timeline_text(dx: Diagnosis) -> str:
     lines = []
     lines.append("Timeline (close attempts)")
     lines.append("-" * 72)
-    for t in dx.timeline_events:
-        ts_s = t["ts"] or "?"
-        out = t["outcome"]
-        dur = t["duration_ms"]
-        slow = "SLOW" if t["slow"] else "    "
-        wet = "WET" if t["wet"] else "   "
-        hum = t["hum_near"]
+    tl = dx.timeline
+    for ts, out, dur, is_slow, is_wet, hum in zip(tl.ts, tl.outcome, tl.duration_ms,
+                                                  tl.slow, tl.wet, tl.hum_near):
+        ts_s = ts or "?"
+        slow = "SLOW" if is_slow else "    "
+        wet = "WET" if is_wet else "   "
         hum_s = f"{hum:.1f}" if hum is not None else "n/a"
         lines.append(f"{ts_s} | {out:14} | {dur:>6} ms | {slow} {wet} | hum~{hum_s}")
     lines.append("")
@@ -583,30 +784,50 @@ Limitations:
   Standalone log analysis cannot confirm INTENT (command accepted) or safety inhibits.
 """
 
+def _json_default(o: Any) -> Any:
+    if is_dataclass(o):
+        return asdict(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def dumps_json(obj: Any, indent: bool = False) -> bytes:
+    # Dataclasses may be passed as-is; orjson serializes them natively.
+    if orjson is not None:
+        opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, option=opt)
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints wider than 64 bits from the log; stdlib json handles them
+    if indent:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+    return text.encode("utf-8")
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("logfile", type=pathlib.Path)
     ap.add_argument("--json", action="store_true")
     args = ap.parse_args()
 
-    parsed = parse_log(args.logfile.read_text(encoding="utf-8", errors="replace"))
+    with args.logfile.open("r", encoding="utf-8", errors="replace") as fh:
+        parsed = parse_log_file(fh)
     bl, ft, dx = analyze(parsed)
 
     if args.json:
-        print(json.dumps({
+        print(dumps_json({
             "version": VERSION,
             "header": parsed.header,
-            "baselines": asdict(bl),
-            "features": asdict(ft),
+            "baselines": bl,
+            "features": ft,
             "diagnosis": {
                 "scores": dx.scores,
                 "recommendations": dx.recommendations,
                 "notes": dx.notes,
-                "confidence": asdict(dx.confidence),
-                "timeline_events": dx.timeline_events,
+                "confidence": dx.confidence,
+                "timeline_events": dx.timeline.to_dicts(),
                 "episodes": dx.episodes,
             },
-        }, indent=2))
+        }, indent=True).decode("utf-8"))
     else:
         print(render_report(parsed, bl, ft, dx))
 
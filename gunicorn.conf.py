@@ -0,0 +1,11 @@
+# gunicorn -c gunicorn.conf.py webapp:app
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# Bellatron analysis is pure-Python CPU work: one worker per core.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Import webapp (and bellatron_engine) once in the master, then fork.
+preload_app = True
@@ -0,0 +1,157 @@
+import io
+import json
+
+import bellatron_engine as be
+
+
+def _analyze(text):
+    parsed = be.parse_log(text)
+    return parsed, be.analyze(parsed)
+
+
+def test_dumps_json_handles_ints_wider_than_64_bits():
+    text = ("2025-01-01T00:00:00Z | MOVE | to=closed start_deg=90 end_deg=0 "
+            "duration_ms=99999999999999999999 reed_end=1 reed_settle_30s=1\n")
+    parsed, (bl, ft, dx) = _analyze(text)
+    payload = {
+        "baselines": bl,
+        "features": ft,
+        "confidence": dx.confidence,
+        "timeline_events": dx.timeline.to_dicts(),
+    }
+    for indent in (False, True):
+        out = json.loads(be.dumps_json(payload, indent=indent))
+        assert out["timeline_events"][0]["duration_ms"] == 99999999999999999999
+
+
+def test_parse_log_splits_lines_like_splitlines(tmp_path):
+    text = ("2025-01-01T00:00:00Z | MOVE | to=closed reed_end=1\r"
+            "2025-01-01T00:01:00Z | MOVE | to=closed reed_end=0\r\n"
+            "\n"
+            "2025-01-01T00:02:00Z | SNAPSHOT | hum=80\u2028"
+            "2025-01-01T00:03:00Z | MOVE | to=closed reed_end=1\x0c\n"
+            "2025-01-01T00:04:00Z | SNAPSHOT | hum=81")
+    assert list(be._iter_lines(text)) == text.splitlines()
+
+    # webapp path: TextIOWrapper over the upload bytes
+    upload = io.TextIOWrapper(io.BytesIO(text.encode("utf-8")), encoding="utf-8")
+    # CLI path: the log file opened in text mode
+    log_path = tmp_path / "log.txt"
+    log_path.write_bytes(text.encode("utf-8"))
+    with log_path.open("r", encoding="utf-8", errors="replace") as fh:
+        from_file = be.parse_log_file(fh)
+
+    for parsed in (be.parse_log(text), be.parse_log_file(upload), from_file):
+        events = parsed.events
+        assert [e.typ for e in events] == ["MOVE", "MOVE", "SNAPSHOT", "MOVE", "SNAPSHOT"]
+        assert [e.reed_end for e in events] == [1, 0, -1, 1, -1]
+        assert [e.line for e in events] == [1, 2, 4, 5, 7]
+        assert events[2].kv == {"hum": "80"}
+
+
+def test_nearest_snapshot_humidity_prefers_last_logged_on_equal_timestamps():
+    parsed = be.parse_log(
+        "2025-01-01T00:10:00Z | SNAPSHOT | hum=90\n"
+        "2025-01-01T00:00:00Z | SNAPSHOT | hum=50\n"
+        "2025-01-01T00:00:00Z | SNAPSHOT | hum=60\n"
+        "2025-01-01T00:10:00Z | SNAPSHOT | hum=91\n"
+    )
+    series = be.build_snapshot_series(parsed.events)
+    times = [be.parse_iso(ts) for ts in (
+        "2025-01-01T00:00:00Z",  # exact match
+        "2025-01-01T00:01:00Z",  # nearest group is before t
+        "2025-01-01T00:09:00Z",  # nearest group is after t
+        "2025-01-01T00:10:00Z",  # exact match
+        "2025-01-01T00:05:00Z",  # equidistant: earlier snapshot wins
+    )]
+    expected = [60.0, 60.0, 91.0, 91.0, 60.0]
+    assert [be.nearest_snapshot_humidity(series, t) for t in times] == expected
+    assert be.nearest_snapshot_humidities(series, times) == expected
+
+
+def _timeline(flags):
+    # flags per close: "H" hard fail, "S" slow+wet, "D" post-close drift
+    n = len(flags)
+    return be.TimelineArrays(
+        ts=[str(i) for i in range(n)],
+        outcome=["HARD_FAIL" if "H" in f else "GOOD_CLOSE" for f in flags],
+        duration_ms=[1000] * n,
+        slow=["S" in f for f in flags],
+        hum_near=[None] * n,
+        wet=["S" in f for f in flags],
+        start_deg=[None] * n,
+        end_deg=[None] * n,
+        travel_pct=[None] * n,
+        end_reason=[""] * n,
+        reed_end=[1] * n,
+        reed_settle_30s=[1] * n,
+        drift=["D" in f for f in flags],
+    )
+
+
+def _episodes(flags):
+    short = {
+        "MECHANICAL_HARD_FAIL_WINDOW": "H",
+        "HUMIDITY_DRAG_WINDOW": "S",
+        "POST_CLOSE_DRIFT_WINDOW": "D",
+    }
+    return [(short[e["kind"]], int(e["start_ts"]), int(e["end_ts"]), e["count"])
+            for e in be._build_episodes(_timeline(flags))]
+
+
+def test_episodes_humidity_window_absorbs_trailing_hard_fail():
+    assert _episodes(["S", "SH"]) == [("S", 0, 1, 2)]
+    # the rest of the hard-fail run starts its own window
+    assert _episodes(["S", "SH", "H"]) == [("S", 0, 1, 2), ("H", 2, 2, 1)]
+
+
+def test_episodes_hard_fail_beats_slow_wet_at_same_index():
+    assert _episodes(["SH", "S"]) == [("H", 0, 0, 1), ("S", 1, 1, 1)]
+    assert _episodes(["SH", "SH", "S"]) == [("H", 0, 1, 2), ("S", 2, 2, 1)]
+
+
+def test_episodes_drift_interleaved_with_other_kinds():
+    assert _episodes(["D", "SD", "S", "D", "H", "", "D", "D"]) == [
+        ("D", 0, 1, 2), ("S", 2, 2, 1), ("D", 3, 3, 1), ("H", 4, 4, 1), ("D", 6, 7, 2),
+    ]
+    # a humidity window absorbs drift; the drift run resumes after it
+    assert _episodes(["S", "SD", "D", ""]) == [("S", 0, 1, 2), ("D", 2, 2, 1)]
+    assert _episodes(["", "", ""]) == []
+
+
+def _ladder_outcome(reed, tp):
+    # the if/elif ladder OUTCOME_TABLE replaced
+    if reed == 1:
+        return "GOOD_CLOSE" if tp is None or tp >= 0.95 else "MARGINAL_CLOSE"
+    if reed == 0:
+        return "HARD_FAIL" if tp is None or tp < 0.60 else "LATCH_MISS"
+    return "UNKNOWN"
+
+
+def test_outcome_table_matches_ladder_at_boundaries():
+    reeds = [-1, 0, 1, 2]
+    tps = [None, 0.59, 0.60, 0.79, 0.80, 0.94, 0.95, 1.0]
+    cases = [(reed, tp) for reed in reeds for tp in tps]
+    # max_travel=1.0 and start=0 make travel_pct == end_deg exactly; a NaN start gives None
+    _, _, _, outcomes, counts = be._classify_closes(
+        reed_end=[reed for reed, _ in cases],
+        reed_settle_30s=[1] * len(cases),
+        start_deg=[be.NAN if tp is None else 0.0 for _, tp in cases],
+        end_deg=[0.0 if tp is None else tp for _, tp in cases],
+        duration_ms=[1000] * len(cases),
+        slow_cut=None,
+        max_travel=1.0,
+    )
+    for (reed, tp), got in zip(cases, outcomes):
+        assert got == _ladder_outcome(reed, tp), (reed, tp, got)
+    assert sum(counts.values()) == len(cases)
+
+
+def test_event_accepts_parsed_kv_dict():
+    kv = {"to": "CLOSED", "reed_end": "1", "duration_ms": "5200", "start_deg": "2.5"}
+    e = be.Event(None, "MOVE", kv, 3)
+    assert e.kv == kv
+    assert (e.to, e.reed_end, e.duration_ms, e.start_deg) == ("CLOSED", 1, 5200, 2.5)
+    parsed = be.parse_log("?|MOVE|to=CLOSED reed_end=1 duration_ms=5200 start_deg=2.5").events[0]
+    assert (parsed.kv, parsed.reed_end, parsed.duration_ms) == (e.kv, e.reed_end, e.duration_ms)
+    assert be.Event(None, "BOOT", "fw=1.2 x", 1).kv == {"fw": "1.2"}
@@ -1,16 +1,29 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import io
 import os
 import tempfile
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify
+from typing import Any, Callable, Iterable
+from flask import Flask, abort, render_template, request, jsonify
 
 import bellatron_engine as be  # make sure bellatron_engine.py is in same folder as this file
 
 APP_DIR = Path(__file__).resolve().parent
 UPLOAD_MAX_BYTES = 512 * 1024  # 512KB (logs are tiny; this blocks abuse)
 ALLOWED_EXTS = {".txt", ".log"}
+ANALYZE_CACHE_SIZE = 128  # serialized results of recent uploads, keyed by content digest
+
+PAGE_MAX_AGE_S = 3600  # browser cache lifetime for the HTML pages below
+CACHEABLE_PAGES = {"home", "bellatron_page"}
+
+_analyze_cache: OrderedDict[str, bytes] = OrderedDict()
+_analyze_lock = threading.Lock()
+_page_cache: dict = {}  # (page, engine version) -> page data, built once per process
 
 app = Flask(
     __name__,
@@ -18,18 +31,54 @@ app = Flask(
     template_folder=str(APP_DIR / "templates"),
 )
 app.config["MAX_CONTENT_LENGTH"] = UPLOAD_MAX_BYTES
+INDEX_PATH = Path(app.static_folder) / "index.html"
 
 
 @app.get("/")
 def home():
     # If you're already serving index.html as a static file, you can remove this route.
     # This is here to keep Flask usable as a standalone server.
-    return app.send_static_file("index.html")
+    body, etag, mtime = _cached_page("index", _read_index)
+    resp = app.response_class(body, mimetype="text/html")
+    # keep the conditional GET send_static_file gave us (304 on If-None-Match/If-Modified-Since)
+    resp.set_etag(etag)
+    resp.last_modified = mtime
+    return resp.make_conditional(request)
 
 
 @app.get("/bellatron")
 def bellatron_page():
-    return render_template("bellatron.html", engine_version=be.VERSION)
+    return _cached_page(
+        "bellatron", lambda: render_template("bellatron.html", engine_version=be.VERSION))
+
+
+def _read_index() -> tuple[bytes, str, float]:
+    try:
+        body = INDEX_PATH.read_bytes()
+        mtime = INDEX_PATH.stat().st_mtime
+    except FileNotFoundError:
+        abort(404)
+    return body, blake2b(body, digest_size=16).hexdigest(), mtime
+
+
+def _cached_page(name: str, build: Callable[[], Any]) -> Any:
+    # Build once per (page, engine version); in debug mode always rebuild so
+    # template/page edits show up (the reloader only watches .py files).
+    if app.debug:
+        return build()
+    key = (name, be.VERSION)
+    body = _page_cache.get(key)
+    if body is None:
+        body = build()
+        _page_cache[key] = body
+    return body
+
+
+@app.after_request
+def _cache_pages(resp):
+    if request.endpoint in CACHEABLE_PAGES and resp.status_code in (200, 304):
+        resp.headers.setdefault("Cache-Control", f"public, max-age={PAGE_MAX_AGE_S}")
+    return resp
 
 
 def _ext_ok(filename: str) -> bool:
@@ -49,33 +98,52 @@ def bellatron_analyze():
         return jsonify({"ok": False, "error": "Only .txt/.log files are accepted."}), 400
 
     raw = f.read()
-    try:
-        text = raw.decode("utf-8", errors="replace")
-    except Exception:
-        return jsonify({"ok": False, "error": "Unable to decode file as text."}), 400
+    digest = blake2b(raw, digest_size=16).hexdigest()
+    return app.response_class(_analyze_cached(digest, raw), mimetype="application/json")
+
 
+def _analyze_payload(fh: Iterable[str]) -> bytes:
     # Run Bellatron
-    parsed = be.parse_log(text)
+    parsed = be.parse_log_file(fh)
     bl, ft, dx = be.analyze(parsed)
 
-    payload = {
+    return be.dumps_json({
         "ok": True,
         "version": be.VERSION,
         "header": parsed.header,
-        "baselines": bl.__dict__,
-        "features": ft.__dict__,
+        "baselines": bl,
+        "features": ft,
         "diagnosis": {
             "scores": dx.scores,
             "recommendations": dx.recommendations,
             "notes": dx.notes,
-            "confidence": dx.confidence.__dict__,
-            "timeline_events": dx.timeline_events,
+            "confidence": dx.confidence,
+            "timeline_events": dx.timeline.to_dicts(),
             "episodes": dx.episodes,
         },
-    }
-    return jsonify(payload)
+    })
+
+
+def _analyze_cached(digest: str, raw: bytes) -> bytes:
+    # LRU keyed by the upload's digest only, so cached entries don't pin the log text.
+    with _analyze_lock:
+        payload = _analyze_cache.get(digest)
+        if payload is not None:
+            _analyze_cache.move_to_end(digest)
+            return payload
+
+    # decode line by line rather than building the whole text and a splitlines() list
+    fh = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8", errors="replace")
+    payload = _analyze_payload(fh)
+    with _analyze_lock:
+        _analyze_cache[digest] = payload
+        while len(_analyze_cache) > ANALYZE_CACHE_SIZE:
+            _analyze_cache.popitem(last=False)
+    return payload
 
 
 if __name__ == "__main__":
-    # Local dev
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "8080")), debug=True)
+    # Local dev only (set FLASK_DEBUG=1 for the reloader/debugger).
+    # Production: gunicorn -c gunicorn.conf.py webapp:app
+    debug = os.environ.get("FLASK_DEBUG") == "1"
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "8080")), debug=debug)